@@ -2,6 +2,7 @@ import asyncio
 import logging
 from urllib.parse import urljoin
 
+import orjson
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
@@ -28,6 +29,7 @@ from app.db.database import Database
 
 
 async def on_shutdown(db: Database, bot: Bot, services: ServicesContainer) -> None:
+    services.server_pool.stop_session_refresh()
     await services.notification.notify_developer(BOT_STOPPED_TAG)
     await commands.delete(bot)
     await bot.delete_webhook()
@@ -45,6 +47,7 @@ async def on_startup(config: Config, bot: Bot, services: ServicesContainer) -> N
     current_webhook = await bot.get_webhook_info()
     logging.info(f"Current webhook URL: {current_webhook.url}")
 
+    services.server_pool.start_session_refresh()
     await services.notification.notify_developer(BOT_STARTED_TAG)
     logging.info("Bot started.")
 
@@ -63,7 +66,11 @@ async def main() -> None:
     db = Database(config.database)
 
     # Set up storage for FSM (Finite State Machine)
-    storage = RedisStorage.from_url("redis://0.0.0.0:6379/0")
+    storage = RedisStorage.from_url(
+        "redis://0.0.0.0:6379/0",
+        json_loads=orjson.loads,
+        json_dumps=lambda data: orjson.dumps(data).decode(),
+    )
     # storage = MemoryStorage()
 
     # Initialize the bot with the token and default properties
@@ -110,6 +117,9 @@ async def main() -> None:
     # Initialize database
     await db.initialize()
 
+    # Open pooled database connections before the first update arrives
+    await db.warmup()
+
     # Set up bot commands
     await commands.setup(bot)
 
@@ -14,8 +14,13 @@ def register(dispatcher: Dispatcher, i18n: I18n, session: async_sessionmaker) ->
         GarbageMiddleware(),
         # SimpleI18nMiddleware(i18n),
         MaintenanceMiddleware(),
-        DBSessionMiddleware(session),
     ]
 
     for middleware in middlewares:
         dispatcher.update.middleware.register(middleware)
+
+    # Only events with a human sender need a database session and user
+    database_middleware = DBSessionMiddleware(session)
+    dispatcher.message.outer_middleware.register(database_middleware)
+    dispatcher.callback_query.outer_middleware.register(database_middleware)
+    dispatcher.pre_checkout_query.outer_middleware.register(database_middleware)
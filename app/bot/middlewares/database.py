@@ -1,9 +1,8 @@
 import logging
-import uuid
 from typing import Any, Awaitable, Callable
 
 from aiogram import BaseMiddleware
-from aiogram.types import TelegramObject
+from aiogram.types import CallbackQuery, Message, PreCheckoutQuery, TelegramObject
 from aiogram.types import User as TelegramUser
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
@@ -20,29 +19,24 @@ class DBSessionMiddleware(BaseMiddleware):
     async def __call__(
         self,
         handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
-        event: TelegramObject,
+        event: Message | CallbackQuery | PreCheckoutQuery,
         data: dict[str, Any],
     ) -> Any:
+        telegram_user: TelegramUser | None = event.from_user
+
+        if telegram_user is None or telegram_user.is_bot:
+            logger.debug("No user found in event data.")
+            return await handler(event, data)
+
         session: AsyncSession
         async with self.session() as session:
-            telegram_user: TelegramUser | None = event.event.from_user
-
-            if telegram_user is not None and not telegram_user.is_bot:
-                user = await User.get(session=session, tg_id=telegram_user.id)
-
-                if not user:
-                    user = await User.create(
-                        session=session,
-                        tg_id=user.id,
-                        vpn_id=str(uuid.uuid4()),
-                        first_name=user.first_name,
-                        username=user.username,
-                    )
-                    logger.info(f"New user {user.tg_id} created.")  # TODO: Notify
-
-                data["user"] = user
-                data["session"] = session
-            else:
-                logger.debug("No user found in event data.")
-
+            user = await User.get_or_create(
+                session=session,
+                tg_id=telegram_user.id,
+                first_name=telegram_user.first_name,
+                username=telegram_user.username,
+            )
+
+            data["user"] = user
+            data["session"] = session
             return await handler(event, data)
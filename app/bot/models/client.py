@@ -1,16 +1,29 @@
 import logging
 import math
-import time
-from datetime import datetime, timezone
 
 from aiogram.utils.i18n import gettext as _
+from aiogram.utils.i18n import lazy_gettext as __
 
 from app.bot.utils.constants import UNLIMITED
+from app.bot.utils.misc import get_current_timestamp
 
 logger = logging.getLogger(__name__)
 
+SIZE_UNITS = (__("MB"), __("GB"), __("TB"), __("PB"), __("EB"), __("ZB"), __("YB"))
+BYTES_PER_MB = 1 << 20
+
 
 class ClientData:
+    __slots__ = (
+        "_max_devices",
+        "_traffic_total",
+        "_traffic_remaining",
+        "_traffic_used",
+        "_traffic_up",
+        "_traffic_down",
+        "_expiry_time",
+    )
+
     def __init__(
         self,
         max_devices: int,
@@ -28,7 +41,7 @@ class ClientData:
         self._traffic_up = traffic_up
         self._traffic_down = traffic_down
         self._expiry_time = expiry_time
-        logger.debug(f"ClientData initialized: {self.__str__()}")
+        logger.debug("ClientData initialized: %s", self)
 
     def __str__(self) -> str:
         return (
@@ -71,7 +84,7 @@ class ClientData:
 
     @property
     def has_subscription_expired(self) -> bool:
-        current_time = time.time() * 1000
+        current_time = get_current_timestamp()
         expired = self._expiry_time != -1 and current_time > self._expiry_time
         logger.debug(f"Subscription expired: {expired}")
         return expired
@@ -83,16 +96,14 @@ class ClientData:
             elif size_bytes == 0:
                 return f"{size_bytes} {_('MB')}"
 
-            size_units_keys = [_("MB"), _("GB"), _("TB"), _("PB"), _("EB"), _("ZB"), _("YB")]
-            size_in_mb = max(size_bytes / 1024**2, 1)
-            i = min(int(math.floor(math.log(size_in_mb, 1024))), len(size_units_keys) - 1)
-            p = math.pow(1024, i)
-            s = round(size_in_mb / p, 2)
+            size_in_mb = max(size_bytes / BYTES_PER_MB, 1)
+            i = min(int(math.log(size_in_mb, 1024)), len(SIZE_UNITS) - 1)
+            s = round(size_in_mb / (1 << (10 * i)), 2)
 
             if s.is_integer():
                 s = int(s)
 
-            result = f"{s} {size_units_keys[i]}"
+            result = f"{s} {SIZE_UNITS[i]}"
             logger.debug(f"Converted size: {size_bytes} bytes to {result}")
             return result
         except Exception as exception:
@@ -104,11 +115,9 @@ class ClientData:
             if expiry_time == -1:
                 return UNLIMITED
 
-            now = datetime.now(tz=timezone.utc)
-            expiry_datetime = datetime.fromtimestamp(expiry_time / 1000, tz=timezone.utc)
-            time_left = expiry_datetime - now
+            time_left = (expiry_time - get_current_timestamp()) // 1000
 
-            days, remainder = divmod(time_left.total_seconds(), 86400)
+            days, remainder = divmod(time_left, 86400)
             hours, remainder = divmod(remainder, 3600)
             minutes = remainder // 60
 
@@ -1,9 +1,50 @@
+import asyncio
+from typing import Any, Awaitable, Callable, TypeVar
+
+import httpx
+from aiolimiter import AsyncLimiter
 from py3xui import AsyncApi
 
 from app.db.models import Server
 
+T = TypeVar("T")
+
+# 3X-UI answers API requests with an expired session with 404 (401 on older versions).
+AUTH_ERROR_STATUSES = (401, 404)
+
 
 class Connection:
-    def __init__(self, server: Server, api: AsyncApi) -> None:
+    def __init__(
+        self,
+        server: Server,
+        api: AsyncApi,
+        max_concurrency: int,
+        rate_limit: int,
+    ) -> None:
         self.server = server
         self.api = api
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.limiter = AsyncLimiter(max_rate=rate_limit, time_period=1)
+        self.login_lock = asyncio.Lock()
+
+    async def call(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        session = self.api.session
+
+        try:
+            return await self._call(func, *args, **kwargs)
+        except httpx.HTTPStatusError as exception:
+            if exception.response.status_code not in AUTH_ERROR_STATUSES:
+                raise
+
+        await self.relogin(expired_session=session)
+        return await self._call(func, *args, **kwargs)
+
+    async def relogin(self, expired_session: str | None = None) -> None:
+        async with self.login_lock:
+            # Another request may have already renewed the session while we waited.
+            if expired_session is None or self.api.session == expired_session:
+                await self._call(self.api.login)
+
+    async def _call(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        async with self.limiter, self.semaphore:
+            return await func(*args, **kwargs)
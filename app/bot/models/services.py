@@ -14,7 +14,7 @@ if TYPE_CHECKING:
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ServicesContainer:
     server_pool: ServerPoolService
     plan: PlanService
@@ -1,4 +1,7 @@
+from functools import lru_cache
+
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.utils.i18n import I18n
 from aiogram.utils.i18n import gettext as _
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
@@ -10,8 +13,19 @@ from app.bot.utils.constants import (
 )
 from app.bot.utils.navigation import NavDownload, NavSubscription, NavSupport
 
+PLATFORM_APPS: dict[str, tuple[str, str]] = {
+    NavDownload.PLATFORM_IOS: ("v2raytun", V2RAYTUN_IOS_LINK),
+    NavDownload.PLATFORM_ANDROID: ("v2raytun", V2RAYTUN_ANDROID_LINK),
+}
+DEFAULT_PLATFORM_APP = ("hiddify", HIDDIFY_WINDOWS_LINK)
+
 
 def platforms_keyboard(previous_callback: str = None) -> InlineKeyboardMarkup:
+    return _platforms_keyboard(I18n.get_current().current_locale, previous_callback)
+
+
+@lru_cache(maxsize=64)
+def _platforms_keyboard(locale: str, previous_callback: str | None) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
 
     builder.row(
@@ -34,29 +48,27 @@ def platforms_keyboard(previous_callback: str = None) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@lru_cache(maxsize=64)
+def _download_button(locale: str, download: str) -> InlineKeyboardButton:
+    return InlineKeyboardButton(text=_("download:button:download"), url=download)
+
+
 def download_keyboard(platform: NavDownload, url: str, key: str) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
+    app, download = PLATFORM_APPS.get(platform, DEFAULT_PLATFORM_APP)
 
-    match platform:
-        case NavDownload.PLATFORM_IOS:
-            app = "v2raytun"
-            download = V2RAYTUN_IOS_LINK
-        case NavDownload.PLATFORM_ANDROID:
-            app = "v2raytun"
-            download = V2RAYTUN_ANDROID_LINK
-        case _:
-            app = "hiddify"
-            download = HIDDIFY_WINDOWS_LINK
-
-    connect = f"{url}connection?app={app}&key={key}"
-
-    builder.button(text=_("download:button:download"), url=download)
-
-    builder.button(
-        text=_("download:button:connect"),
-        url=connect if key else None,
-        callback_data=NavSubscription.MAIN if not key else None,
-    )
+    builder.add(_download_button(I18n.get_current().current_locale, download))
+
+    if key:
+        builder.button(
+            text=_("download:button:connect"),
+            url=f"{url}connection?app={app}&key={key}",
+        )
+    else:
+        builder.button(
+            text=_("download:button:connect"),
+            callback_data=NavSubscription.MAIN,
+        )
 
     builder.row(back_button(NavDownload.MAIN))
     return builder.as_markup()
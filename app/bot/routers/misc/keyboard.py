@@ -1,4 +1,7 @@
+from functools import lru_cache
+
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.utils.i18n import I18n
 from aiogram.utils.i18n import gettext as _
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
@@ -23,6 +26,11 @@ def back_button(callback: str) -> InlineKeyboardButton:
 
 
 def back_keyboard(callback: str) -> InlineKeyboardMarkup:
+    return _back_keyboard(I18n.get_current().current_locale, callback)
+
+
+@lru_cache(maxsize=128)
+def _back_keyboard(locale: str, callback: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[[back_button(callback)]])
 
 
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 from aiogram import F, Router
@@ -44,8 +45,10 @@ async def handle_promocode_input(
 
     promocode = await Promocode.get(session, input_promocode)
     if promocode and not promocode.is_activated:
-        success = await services.vpn.activate_promocode(user, promocode)
-        message_id = await state.get_value(MAIN_MESSAGE_ID_KEY)
+        success, message_id = await asyncio.gather(
+            services.vpn.activate_promocode(session, user, promocode),
+            state.get_value(MAIN_MESSAGE_ID_KEY),
+        )
         if success:
             await message.bot.edit_message_text(
                 text=_("promocode:message:activated_success").format(
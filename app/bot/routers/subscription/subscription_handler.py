@@ -4,11 +4,10 @@ from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery
 from aiogram.utils.i18n import gettext as _
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bot.models import ClientData, ServicesContainer, SubscriptionData
 from app.bot.utils.navigation import NavSubscription
-from app.db.models import Server, User
+from app.db.models import User
 
 from .keyboard import (
     devices_keyboard,
@@ -79,14 +78,13 @@ async def callback_subscription_extend(
 async def callback_subscription_process(
     callback: CallbackQuery,
     user: User,
-    session: AsyncSession,
     callback_data: SubscriptionData,
     services: ServicesContainer,
 ) -> None:
     logger.info(f"User {user.tg_id} started subscription process.")
-    server = await Server.get_available(session)
+    server_id = await services.server_pool.get_available_server_id()
 
-    if not server:
+    if not server_id:
         await services.notification.show_popup(
             callback=callback,
             text=_("subscription:popup:no_available_servers"),
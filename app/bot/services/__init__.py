@@ -22,7 +22,7 @@ async def initialize(
 ) -> ServicesContainer:
     server_pool = ServerPoolService(config, session)
     plan = PlanService()
-    vpn = VPNService(session, server_pool)
+    vpn = VPNService(config, server_pool)
     payment = PaymentService(app, config, bot, session, storage, vpn)
     notification = NotificationService(config, bot)
 
@@ -1,9 +1,12 @@
+import asyncio
 import logging
+import time
 
 from py3xui import AsyncApi
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from app.bot.models import Connection
+from app.bot.utils.constants import AVAILABLE_SERVER_CACHE_TTL, XUI_SESSION_REFRESH_INTERVAL
 from app.config import Config
 from app.db.models import Server, User
 
@@ -15,6 +18,10 @@ class ServerPoolService:
         self.config = config
         self.session = session
         self.__servers: dict[int, Connection] = {}
+        self.__refresh_task: asyncio.Task | None = None
+        self.__available_server_id: int | None = None
+        self.__available_server_checked_at = 0.0
+        self.__available_server_lock = asyncio.Lock()
         logger.info("Server Pool Service initialized.")
 
     async def __add_server(self, server: Server) -> None:
@@ -29,52 +36,58 @@ class ServerPoolService:
             )
             try:
                 await api.login()
-                server_conn = Connection(server=server, api=api)
+                server_conn = Connection(
+                    server=server,
+                    api=api,
+                    max_concurrency=self.config.xui.MAX_CONCURRENCY,
+                    rate_limit=self.config.xui.RPS,
+                )
                 self.__servers[server.id] = server_conn
-                logger.info(f"Server {server.name} ({server.host}) added successfully.")
+                logger.info("Server %s (%s) added successfully.", server.name, server.host)
             except Exception as exception:
                 logger.error(
-                    f"Failed to initialize server {server.name} ({server.host}): {exception}"
+                    "Failed to initialize server %s (%s): %s", server.name, server.host, exception
                 )
 
     def __remove_server(self, server: Server) -> None:
         if server.id in self.__servers:
             try:
                 del self.__servers[server.id]
-                logger.info(f"Server {server.name} removed successfully.")
+                logger.info("Server %s removed successfully.", server.name)
             except Exception as exception:
-                logger.error(f"Failed to remove server {server.name}: {exception}")
+                logger.error("Failed to remove server %s: %s", server.name, exception)
 
     async def get_connection(self, user: User) -> Connection | None:
         if not user.server_id:
-            logger.debug(f"User {user.tg_id} not assigned to any server.")
+            logger.debug("User %s not assigned to any server.", user.tg_id)
             return None
 
         connection = self.__servers.get(user.server_id)
 
         if not connection:
-            available_servers = list(self.__servers.keys())
             logger.critical(
-                f"Server {user.server_id} not found in pool. "
-                f"User assigned server: {user.server_id}, "
-                f"Available servers in pool: {available_servers}"
+                "Server %s not found in pool. User assigned server: %s, "
+                "Available servers in pool: %s",
+                user.server_id,
+                user.server_id,
+                list(self.__servers.keys()),
             )
 
             async with self.session() as session:
                 server = await Server.get_by_id(session, user.server_id)
 
             if server:
-                logger.debug(f"Server {server.name} ({server.host}) found in database.")
+                logger.debug("Server %s (%s) found in database.", server.name, server.host)
                 # TODO: Try to add server to pool
             else:
-                logger.error(f"Server {user.server_id} not found in database.")
+                logger.error("Server %s not found in database.", user.server_id)
 
             return None
 
-        async with self.session() as session:
-            server = await Server.get_by_id(session, user.server_id)
+        # user.server is stale after a reassignment until the user is reloaded.
+        if user.server and user.server.id == user.server_id:
+            connection.server = user.server
 
-        connection.server = server
         return connection
 
     async def sync_servers(self) -> None:
@@ -95,10 +108,60 @@ class ServerPoolService:
             if server.id not in self.__servers:
                 await self.__add_server(server)
 
-        logger.info(f"Sync complete. Currently active servers: {len(self.__servers)}")
+        logger.info("Sync complete. Currently active servers: %s", len(self.__servers))
+
+    def __cached_available_server_id(self) -> int | None:
+        age = time.monotonic() - self.__available_server_checked_at
+        return self.__available_server_id if age < AVAILABLE_SERVER_CACHE_TTL else None
+
+    async def get_available_server_id(self) -> int | None:
+        server_id = self.__cached_available_server_id()
+
+        if server_id:
+            return server_id
+
+        async with self.__available_server_lock:
+            server_id = self.__cached_available_server_id()
+
+            if server_id:
+                return server_id
+
+            async with self.session() as session:
+                server_id = await Server.get_available_id(session)
+
+            self.__available_server_id = server_id
+            self.__available_server_checked_at = time.monotonic()
+            return server_id
+
+    async def __refresh_sessions(self) -> None:
+        while True:
+            await asyncio.sleep(XUI_SESSION_REFRESH_INTERVAL)
+
+            for connection in list(self.__servers.values()):
+                try:
+                    await connection.relogin()
+                    logger.debug("Session for server %s refreshed.", connection.server.name)
+                except Exception as exception:
+                    logger.error(
+                        "Failed to refresh session for server %s: %s",
+                        connection.server.name,
+                        exception,
+                    )
+
+    def start_session_refresh(self) -> None:
+        if self.__refresh_task is None or self.__refresh_task.done():
+            self.__refresh_task = asyncio.create_task(self.__refresh_sessions())
+            logger.info("Session refresh for servers started.")
+
+    def stop_session_refresh(self) -> None:
+        if self.__refresh_task is not None:
+            self.__refresh_task.cancel()
+            self.__refresh_task = None
+            logger.info("Session refresh for servers stopped.")
 
     async def assign_server_to_user(self, user: User) -> None:
         async with self.session() as session:
-            server = await Server.get_available(session)
-            await User.update(session, user.tg_id, server_id=server.id)
-            # await session.refresh(user, ["server"])
+            server_id = await Server.get_available_id(session)
+            await User.update(session, user.tg_id, server_id=server_id)
+
+        user.server_id = server_id
@@ -5,40 +5,68 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from .server_pool import ServerPoolService
 
+import asyncio
 import logging
 
+import httpx
+from cachetools import TTLCache
 from py3xui import Client, Inbound
-from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.bot.models import ClientData
+from app.bot.models import ClientData, Connection
+from app.bot.utils.constants import CLIENT_CACHE_TTL
 from app.bot.utils.misc import (
     add_days_to_timestamp,
     days_to_timestamp,
     get_current_timestamp,
 )
+from app.config import Config
 from app.db.models import Promocode, User
 
 logger = logging.getLogger(__name__)
 
 
 class VPNService:
-    def __init__(self, session: async_sessionmaker, server_pool_service: ServerPoolService) -> None:
-        self.session = session
+    def __init__(self, config: Config, server_pool_service: ServerPoolService) -> None:
         self.server_pool_service = server_pool_service
+        self._inbound_id = config.xui.INBOUND_ID
+        self._flow = config.xui.FLOW
+        self._clients: TTLCache[int, asyncio.Task[Client | None]] = TTLCache(
+            maxsize=4096, ttl=CLIENT_CACHE_TTL
+        )
         logger.info("VPN Service initialized.")
 
+    async def _get_client(self, connection: Connection, user: User) -> Client | None:
+        task = self._clients.get(user.tg_id)
+
+        if task is None:
+            task = asyncio.create_task(
+                connection.call(connection.api.client.get_by_email, user.email)
+            )
+            self._clients[user.tg_id] = task
+
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            if self._clients.get(user.tg_id) is task:
+                del self._clients[user.tg_id]
+            raise
+
+    def _invalidate_client(self, user: User) -> None:
+        self._clients.pop(user.tg_id, None)
+
     async def is_client_exists(self, user: User) -> Client | None:
         connection = await self.server_pool_service.get_connection(user)
 
         if not connection:
             return None
 
-        client = await connection.api.client.get_by_email(str(user.tg_id))
+        client = await self._get_client(connection, user)
 
         if client:
-            logger.debug(f"Client {user.tg_id} exists on server {connection.server.name}.")
+            logger.debug("Client %s exists on server %s.", user.tg_id, connection.server.name)
         else:
-            logger.critical(f"Client {user.tg_id} not found on server {connection.server.name}.")
+            logger.critical("Client %s not found on server %s.", user.tg_id, connection.server.name)
 
         return client
 
@@ -48,23 +76,26 @@ class VPNService:
         if not connection:
             return None
 
+        return await self._fetch_limit_ip(connection, client.email)
+
+    async def _fetch_limit_ip(self, connection: Connection, email: str) -> int | None:
         try:
-            inbounds: list[Inbound] = await connection.api.inbound.get_list()
+            inbounds: list[Inbound] = await connection.call(connection.api.inbound.get_list)
         except Exception as exception:
-            logger.error(f"Failed to fetch inbounds: {exception}")
+            logger.error("Failed to fetch inbounds: %s", exception)
             return None
 
         for inbound in inbounds:
             for inbound_client in inbound.settings.clients:
-                if inbound_client.email == client.email:
-                    logger.debug(f"Client {client.email} limit ip: {inbound_client.limit_ip}")
+                if inbound_client.email == email:
+                    logger.debug("Client %s limit ip: %s", email, inbound_client.limit_ip)
                     return inbound_client.limit_ip
 
-        logger.critical(f"Client {client.email} not found in inbounds.")
+        logger.critical("Client %s not found in inbounds.", email)
         return None
 
     async def get_client_data(self, user: User) -> ClientData | None:
-        logger.debug(f"Starting to retrieve client data for {user.tg_id}.")
+        logger.debug("Starting to retrieve client data for %s.", user.tg_id)
 
         connection = await self.server_pool_service.get_connection(user)
 
@@ -72,49 +103,56 @@ class VPNService:
             return None
 
         try:
-            client = await connection.api.client.get_by_email(str(user.tg_id))
+            client, limit_ip = await asyncio.gather(
+                self._get_client(connection, user),
+                self._fetch_limit_ip(connection, user.email),
+            )
+        except (httpx.HTTPError, ValueError, ConnectionError):
+            logger.exception("Error retrieving client data for %s.", user.tg_id)
+            return None
 
-            if not client:
-                logger.critical(
-                    f"Client {user.tg_id} not found on server {connection.server.name}."
-                )
-                return None
+        if not client:
+            logger.critical("Client %s not found on server %s.", user.tg_id, connection.server.name)
+            return None
 
-            limit_ip = await self.get_limit_ip(user, client)
-            max_devices = -1 if limit_ip == 0 else limit_ip
-            traffic_total = client.total
-            expiry_time = -1 if client.expiry_time == 0 else client.expiry_time
+        up, down, total, expiry_time = client.up, client.down, client.total, client.expiry_time
+        traffic_used = up + down
 
-            if traffic_total <= 0:
-                traffic_remaining = -1
-                traffic_total = -1
-            else:
-                traffic_remaining = client.total - (client.up + client.down)
-
-            traffic_used = client.up + client.down
-            client_data = ClientData(
-                max_devices=max_devices,
-                traffic_total=traffic_total,
-                traffic_remaining=traffic_remaining,
-                traffic_used=traffic_used,
-                traffic_up=client.up,
-                traffic_down=client.down,
-                expiry_time=expiry_time,
-            )
-            logger.debug(f"Successfully retrieved client data for {user.tg_id}: {client_data}.")
-            return client_data
-        except Exception as exception:
-            logger.error(f"Error retrieving client data for {user.tg_id}: {exception}")
-            return None
+        if total > 0:
+            traffic_total, traffic_remaining = total, total - traffic_used
+        else:
+            traffic_total = traffic_remaining = -1
+
+        client_data = ClientData(
+            max_devices=-1 if limit_ip == 0 else limit_ip,
+            traffic_total=traffic_total,
+            traffic_remaining=traffic_remaining,
+            traffic_used=traffic_used,
+            traffic_up=up,
+            traffic_down=down,
+            expiry_time=expiry_time or -1,
+        )
+        logger.debug("Successfully retrieved client data for %s: %s.", user.tg_id, client_data)
+        return client_data
 
     async def get_key(self, user: User) -> str | None:
         if not user.server_id:
-            logger.debug(f"Server ID for user {user.tg_id} not found.")
+            logger.debug("Server ID for user %s not found.", user.tg_id)
             return None
 
-        subscription = user.server.subscription
-        key = f"{subscription}{user.vpn_id}"
-        logger.debug(f"Fetched key for {user.tg_id}: {key}.")
+        server = user.server
+
+        # After a reassignment user.server still refers to the previous server.
+        if server is None or server.id != user.server_id:
+            connection = await self.server_pool_service.get_connection(user)
+
+            if not connection:
+                return None
+
+            server = connection.server
+
+        key = f"{server.subscription}{user.vpn_id}"
+        logger.debug("Fetched key for %s: %s.", user.tg_id, key)
         return key
 
     async def create_client(
@@ -123,11 +161,11 @@ class VPNService:
         devices: int,
         duration: int,
         enable: bool = True,
-        flow: str = "xtls-rprx-vision",
+        flow: str | None = None,
         total_gb: int = 0,
-        inbound_id: int = 7,
+        inbound_id: int | None = None,
     ) -> bool:
-        logger.info(f"Creating new client {user.tg_id} | {devices} devices {duration} days.")
+        logger.info("Creating new client %s | %s devices %s days.", user.tg_id, devices, duration)
 
         await self.server_pool_service.assign_server_to_user(user)
         connection = await self.server_pool_service.get_connection(user)
@@ -135,23 +173,28 @@ class VPNService:
         if not connection:
             return False
 
-        new_client = Client(
-            email=str(user.tg_id),
+        new_client = Client.model_construct(
+            email=user.email,
             enable=enable,
             id=user.vpn_id,
             expiry_time=days_to_timestamp(duration),
-            flow=flow,
+            flow=self._flow if flow is None else flow,
             limit_ip=devices,
             sub_id=user.vpn_id,
             total_gb=total_gb,
         )
 
         try:
-            await connection.api.client.add(inbound_id, [new_client])
-            logger.info(f"Successfully created client for {user.tg_id}")
+            await connection.call(
+                connection.api.client.add,
+                self._inbound_id if inbound_id is None else inbound_id,
+                [new_client],
+            )
+            self._invalidate_client(user)
+            logger.info("Successfully created client for %s", user.tg_id)
             return True
         except Exception as exception:
-            logger.error(f"Error creating client for {user.tg_id}: {exception}")
+            logger.error("Error creating client for %s: %s", user.tg_id, exception)
             return False
 
     async def update_client(
@@ -162,24 +205,38 @@ class VPNService:
         replace_devices: bool = False,
         replace_duration: bool = False,
         enable: bool = True,
-        flow: str = "xtls-rprx-vision",
+        flow: str | None = None,
         total_gb: int = 0,
+        *,
+        client: Client | None = None,
     ) -> bool:
-        logger.info(f"Updating client {user.tg_id} | {devices} devices {duration} days.")
+        logger.info("Updating client %s | %s devices %s days.", user.tg_id, devices, duration)
         connection = await self.server_pool_service.get_connection(user)
 
         if not connection:
             return False
 
+        limit_ip_task = None
+
         try:
-            client = await connection.api.client.get_by_email(str(user.tg_id))
+            if not replace_devices:
+                # Fetch the current device limit while the client is being resolved.
+                limit_ip_task = asyncio.create_task(self._fetch_limit_ip(connection, user.email))
 
             if client is None:
-                logger.critical(f"Client {user.tg_id} not found for update.")
+                client = await self._get_client(connection, user)
+
+            if client is None:
+                logger.critical("Client %s not found for update.", user.tg_id)
                 return False
 
-            if not replace_devices:
-                current_device_limit = await self.get_limit_ip(user, client)
+            if limit_ip_task:
+                current_device_limit = await limit_ip_task
+
+                if current_device_limit is None:
+                    logger.error("Device limit for client %s is unavailable.", user.tg_id)
+                    return False
+
                 devices = current_device_limit + devices
 
             current_time = get_current_timestamp()
@@ -191,23 +248,37 @@ class VPNService:
 
             expiry_time = add_days_to_timestamp(expiry_time_to_use, duration)
 
-            client.enable = enable
-            client.id = user.vpn_id
-            client.expiry_time = expiry_time
-            client.flow = flow
-            client.limit_ip = devices
-            client.sub_id = user.vpn_id
-            client.total_gb = total_gb
+            client = client.model_copy(
+                update={
+                    "enable": enable,
+                    "id": user.vpn_id,
+                    "expiry_time": expiry_time,
+                    "flow": self._flow if flow is None else flow,
+                    "limit_ip": devices,
+                    "sub_id": user.vpn_id,
+                    "total_gb": total_gb,
+                }
+            )
 
-            await connection.api.client.update(client_uuid=client.id, client=client)
-            logger.info(f"Client {user.tg_id} updated successfully.")
+            await connection.call(
+                connection.api.client.update, client_uuid=client.id, client=client
+            )
+            self._invalidate_client(user)
+            logger.info("Client %s updated successfully.", user.tg_id)
             return True
         except Exception as exception:
-            logger.error(f"Error updating client {user.tg_id}: {exception}")
+            self._invalidate_client(user)
+            logger.error("Error updating client %s: %s", user.tg_id, exception)
             return False
+        finally:
+            # Do not leave the device limit request running after an early exit.
+            if limit_ip_task:
+                limit_ip_task.cancel()
 
     async def create_subscription(self, user: User, devices: int, duration: int) -> bool:
-        if not await self.is_client_exists(user):
+        client = await self.is_client_exists(user)
+
+        if not client:
             return await self.create_client(user, devices, duration)
 
         return await self.update_client(
@@ -216,32 +287,56 @@ class VPNService:
             duration,
             replace_devices=True,
             replace_duration=True,
+            client=client,
         )
 
     async def extend_subscription(self, user: User, devices: int, duration: int) -> bool:
         return await self.update_client(user, devices, duration, replace_devices=True)
 
-    async def activate_promocode(self, user: User, promocode: Promocode) -> bool:
-        async with self.session() as session:
-            activated = await Promocode.set_activated(session, promocode.code, user.tg_id)
+    async def activate_promocode(
+        self,
+        session: AsyncSession,
+        user: User,
+        promocode: Promocode,
+    ) -> bool:
+        activated, client = await asyncio.gather(
+            Promocode.set_activated(session, promocode.code, user.tg_id),
+            self.is_client_exists(user),
+            return_exceptions=True,
+        )
+
+        if isinstance(activated, BaseException):
+            raise activated
 
         if not activated:
-            logger.critical(f"Failed to activate promocode {promocode.code} for user {user.tg_id}.")
+            logger.critical(
+                "Failed to activate promocode %s for user %s.", promocode.code, user.tg_id
+            )
             return False
 
-        if await self.is_client_exists(user):
-            updated = await self.update_client(user, devices=0, duration=promocode.duration)
+        if isinstance(client, BaseException):
+            logger.error("Error looking up client %s: %s", user.tg_id, client)
+            await Promocode.set_deactivated(session, promocode.code)
+            logger.warning("Promocode %s not activated due to failure.", promocode.code)
+            return False
+
+        if client:
+            updated = await self.update_client(
+                user,
+                devices=0,
+                duration=promocode.duration,
+                client=client,
+            )
             if updated:
-                logger.info(f"Updated client {user.tg_id} with promocode {promocode.code}.")
+                logger.info("Updated client %s with promocode %s.", user.tg_id, promocode.code)
                 return True
         else:
             created = await self.create_client(user, devices=1, duration=promocode.duration)
             if created:
-                logger.info(f"Created client {user.tg_id} with promocode {promocode.code}.")
+                logger.info("Created client %s with promocode %s.", user.tg_id, promocode.code)
                 return True
 
-        async with self.session() as session:
-            await Promocode.set_deactivated(session, promocode.code)
+        await Promocode.set_deactivated(session, promocode.code)
 
-        logger.warning(f"Promocode {promocode.code} not activated due to failure.")
+        logger.warning("Promocode %s not activated due to failure.", promocode.code)
         return False
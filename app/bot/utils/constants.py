@@ -15,6 +15,11 @@ SERVER_HOST_KEY = "server_host"
 SERVER_SUBSCRIPTION_KEY = "server_subscription"
 SERVER_MAX_CLIENTS_KEY = "server_max_clients"
 
+# Cache settings
+CLIENT_CACHE_TTL = 5  # Seconds a fetched 3XUI client is reused before re-fetching
+AVAILABLE_SERVER_CACHE_TTL = 5  # Seconds an available server lookup is reused
+XUI_SESSION_REFRESH_INTERVAL = 3300  # Seconds between 3XUI re-logins (cookie expires after 1h)
+
 # Webhook paths
 TELEGRAM_WEBHOOK = "/webhook"  # Webhook path for Telegram bot updates
 YOOKASSA_WEBHOOK = "/yookassa"  # Webhook path for receiving Yookassa payment notifications
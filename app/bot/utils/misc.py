@@ -2,13 +2,14 @@ import logging
 import re
 import time
 import uuid
-from datetime import datetime, timedelta, timezone
 from urllib.parse import parse_qs, urlparse
 
 import aiohttp
 
 logger = logging.getLogger(__name__)
 
+_MS_PER_DAY = 86_400_000
+
 
 def parse_redirect_url(query_string: str) -> dict[str, str]:
     parsed_query = parse_qs(query_string)
@@ -55,18 +56,15 @@ def split_text(text: str, chunk_size: int = 4096) -> list[str]:
 
 
 def get_current_timestamp() -> int:
-    return int(datetime.now(timezone.utc).timestamp() * 1000)
+    return time.time_ns() // 1_000_000
 
 
 def add_days_to_timestamp(timestamp: int, days: int) -> int:
-    current_datetime = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
-    new_datetime = current_datetime + timedelta(days=days)
-    return int(new_datetime.timestamp() * 1000)
+    return timestamp + days * _MS_PER_DAY
 
 
 def days_to_timestamp(days: int) -> int:
-    current_time = get_current_timestamp()
-    return add_days_to_timestamp(current_time, days)
+    return get_current_timestamp() + days * _MS_PER_DAY
 
 
 def generate_code() -> str:
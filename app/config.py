@@ -10,7 +10,16 @@ DEFAULT_DATA_DIR = BASE_DIR / "data"
 DEFAULT_LOCALES_DIR = BASE_DIR / "locales"
 DEFAULT_PLANS_DIR = DEFAULT_DATA_DIR / "plans.json"
 
+DEFAULT_XUI_INBOUND_ID = 7
+DEFAULT_XUI_FLOW = "xtls-rprx-vision"
+DEFAULT_XUI_MAX_CONCURRENCY = 16
+DEFAULT_XUI_RPS = 10
+
+DEFAULT_DB_DRIVER = "sqlite+aiosqlite"
 DEFAULT_DB_NAME = "bot_database"
+DEFAULT_DB_POOL_SIZE = 20
+DEFAULT_DB_MAX_OVERFLOW = 10
+DEFAULT_DB_POOL_RECYCLE = 1800
 
 DEFAULT_LOG_LEVEL = "INFO"
 DEFAULT_LOG_FORMAT = "%(asctime)s | %(name)s | %(levelname)s | %(message)s"
@@ -57,6 +66,10 @@ class XUIConfig:
         PASSWORD (str): Password for XUI authentication.
         TOKEN (str | None): API token for XUI (if provided).
         SUBSCRIPTION (str): Base URL for XUI subscription.
+        INBOUND_ID (int): ID of the inbound that clients are created in.
+        FLOW (str): Flow control mode assigned to clients.
+        MAX_CONCURRENCY (int): Maximum number of in-flight API requests per server.
+        RPS (int): Maximum number of API requests per second per server.
     """
 
     HOST: str
@@ -64,6 +77,10 @@ class XUIConfig:
     PASSWORD: str
     TOKEN: str | None
     SUBSCRIPTION: str
+    INBOUND_ID: int
+    FLOW: str
+    MAX_CONCURRENCY: int
+    RPS: int
 
 
 @dataclass
@@ -86,30 +103,39 @@ class DatabaseConfig:
     Configuration for the database.
 
     Attributes:
+        DRIVER (str): SQLAlchemy dialect and async driver (e.g., "postgresql+asyncpg").
         HOST (str | None): Host address of the database server.
         PORT (int | None): Port number for the database server.
         USERNAME (str | None): Username for database authentication.
         PASSWORD (str | None): Password for database authentication.
         NAME (str): Name of the database to connect to.
+        POOL_SIZE (int): Number of connections kept open in the pool.
+        MAX_OVERFLOW (int): Number of extra connections allowed above the pool size.
+        POOL_RECYCLE (int): Seconds after which a pooled connection is recycled.
     """
 
+    DRIVER: str
     HOST: str | None
     PORT: int | None
     USERNAME: str | None
     PASSWORD: str | None
     NAME: str
+    POOL_SIZE: int
+    MAX_OVERFLOW: int
+    POOL_RECYCLE: int
 
-    def url(self, driver: str = "sqlite+aiosqlite") -> str:
+    def url(self, driver: str | None = None) -> str:
         """
         Generates a database connection URL using the provided driver, username,
         password, host, port, and database name.
 
         Arguments:
-            driver (str): Driver to use for the connection. Defaults to "sqlite+aiosqlite".
+            driver (str | None): Driver to use for the connection. Defaults to `DRIVER`.
 
         Returns:
             str: Generated connection URL.
         """
+        driver = driver or self.DRIVER
         if driver.startswith("sqlite"):
             return f"{driver}:////{DEFAULT_DATA_DIR}/{self.NAME}.sqlite3"
         return f"{driver}://{self.USERNAME}:{self.PASSWORD}@{self.HOST}:{self.PORT}/{self.NAME}"
@@ -193,17 +219,25 @@ def load_config() -> Config:
             PASSWORD=env.str("XUI_PASSWORD"),
             TOKEN=xui_token,
             SUBSCRIPTION=env.str("XUI_SUBSCRIPTION"),
+            INBOUND_ID=env.int("XUI_INBOUND_ID", default=DEFAULT_XUI_INBOUND_ID),
+            FLOW=env.str("XUI_FLOW", default=DEFAULT_XUI_FLOW),
+            MAX_CONCURRENCY=env.int("XUI_MAX_CONCURRENCY", default=DEFAULT_XUI_MAX_CONCURRENCY),
+            RPS=env.int("XUI_RPS", default=DEFAULT_XUI_RPS),
         ),
         yookassa=YooKassaConfig(
             TOKEN=env.str("YOOKASSA_TOKEN", default=None),
             SHOP_ID=env.int("YOOKASSA_SHOP_ID", default=None),
         ),
         database=DatabaseConfig(
+            DRIVER=env.str("DB_DRIVER", default=DEFAULT_DB_DRIVER),
             HOST=env.str("DB_HOST", default=None),
             PORT=env.int("DB_PORT", default=None),
             USERNAME=env.str("DB_USERNAME", default=None),
             PASSWORD=env.str("DB_PASSWORD", default=None),
             NAME=env.str("DB_NAME", default=DEFAULT_DB_NAME),
+            POOL_SIZE=env.int("DB_POOL_SIZE", default=DEFAULT_DB_POOL_SIZE),
+            MAX_OVERFLOW=env.int("DB_MAX_OVERFLOW", default=DEFAULT_DB_MAX_OVERFLOW),
+            POOL_RECYCLE=env.int("DB_POOL_RECYCLE", default=DEFAULT_DB_POOL_RECYCLE),
         ),
         logging=LoggingConfig(
             LEVEL=env.str("LOG_LEVEL", default=DEFAULT_LOG_LEVEL),
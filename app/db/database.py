@@ -1,7 +1,14 @@
+import asyncio
 import logging
 from typing import Self
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import QueuePool
 
 from app.config import DatabaseConfig
 
@@ -13,10 +20,18 @@ logger = logging.getLogger(__name__)
 class Database:
     def __init__(self, config: DatabaseConfig) -> None:
         logger.info("Initializing database engine and session maker.")
-        self.engine = create_async_engine(
-            url=config.url(),
-            pool_pre_ping=True,
-        )
+        url = config.url()
+        pool_options = {}
+
+        if not url.startswith("sqlite"):
+            # SQLite uses NullPool, which does not accept sizing options.
+            pool_options = {
+                "pool_size": config.POOL_SIZE,
+                "max_overflow": config.MAX_OVERFLOW,
+                "pool_recycle": config.POOL_RECYCLE,
+            }
+
+        self.engine = create_async_engine(url=url, pool_pre_ping=True, **pool_options)
         self.session = async_sessionmaker(
             bind=self.engine,
             class_=AsyncSession,
@@ -35,6 +50,31 @@ class Database:
             raise
         return self
 
+    async def warmup(self) -> None:
+        pool = self.engine.pool
+
+        if not isinstance(pool, QueuePool):
+            logger.debug("Database pool does not keep connections, skipping warmup.")
+            return
+
+        logger.info(f"Warming up {pool.size()} database connections.")
+        results = await asyncio.gather(
+            *(self.engine.connect().start() for _ in range(pool.size())),
+            return_exceptions=True,
+        )
+        connections = [result for result in results if isinstance(result, AsyncConnection)]
+        errors = [result for result in results if isinstance(result, BaseException)]
+
+        # Return every connection that did open to the pool, even if others failed.
+        await asyncio.gather(
+            *(connection.close() for connection in connections), return_exceptions=True
+        )
+
+        if errors:
+            logger.error(f"Error warming up database connections: {errors[0]}")
+        else:
+            logger.info("Database connections warmed up successfully.")
+
     async def close(self) -> None:
         logger.info("Closing database engine and releasing resources.")
         try:
@@ -141,6 +141,29 @@ class Server(Base):
         logger.critical("No servers found")
         return None
 
+    @classmethod
+    async def get_available_id(cls, session: AsyncSession) -> int | None:
+        filter = [Server.online == True, Server.current_clients < Server.max_clients]
+        server_id = await session.scalar(
+            select(Server.id).where(*filter).order_by(Server.current_clients).limit(1)
+        )
+
+        if server_id:
+            logger.debug(f"Found server {server_id} with free slots.")
+            return server_id
+
+        filter = [Server.online == True]
+        server_id = await session.scalar(
+            select(Server.id).where(*filter).order_by(Server.current_clients).limit(1)
+        )
+
+        if server_id:
+            logger.warning(f"No servers with free slots. Using least loaded server {server_id}.")
+            return server_id
+
+        logger.critical("No servers found")
+        return None
+
     @classmethod
     async def create(cls, session: AsyncSession, name: str, **kwargs: Any) -> Self | None:
         server = await Server.get_by_name(session=session, name=name)
@@ -1,8 +1,12 @@
 import logging
+import uuid
 from datetime import datetime
+from functools import cached_property
 from typing import Any, Self
 
 from sqlalchemy import ForeignKey, String, func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship, selectinload
@@ -27,6 +31,7 @@ class User(Base):
         server (Server | None): Associated server object.
         transactions (list[Transaction]): List of transactions associated with the user.
         activated_promocodes (list[Promocode]): List of promocodes activated by the user.
+        email (str): Client email on the 3XUI panels (Telegram ID as a string).
     """
 
     __tablename__ = "users"
@@ -53,6 +58,10 @@ class User(Base):
             f"username='{self.username}', created_at={self.created_at})>"
         )
 
+    @cached_property
+    def email(self) -> str:
+        return str(self.tg_id)
+
     @classmethod
     async def get(cls, session: AsyncSession, tg_id: int) -> Self | None:
         filter = [User.tg_id == tg_id]
@@ -94,6 +103,56 @@ class User(Base):
             logger.error(f"Error occurred while creating user {tg_id}: {exception}")
             return None
 
+    @classmethod
+    async def get_or_create(
+        cls,
+        session: AsyncSession,
+        tg_id: int,
+        first_name: str,
+        username: str | None,
+    ) -> Self:
+        user = await User.get(session=session, tg_id=tg_id)
+
+        if user:
+            return user
+
+        insert = postgresql_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+        vpn_id = str(uuid.uuid4())
+        statement = (
+            insert(User)
+            .values(
+                tg_id=tg_id,
+                vpn_id=vpn_id,
+                first_name=first_name,
+                username=username,
+            )
+            .on_conflict_do_update(
+                index_elements=[User.tg_id],
+                set_={"first_name": first_name, "username": username},
+            )
+            .returning(User)
+        )
+        query = await session.execute(
+            select(User)
+            .from_statement(statement)
+            .options(
+                selectinload(User.transactions),
+                selectinload(User.activated_promocodes),
+                selectinload(User.server),
+            )
+            .execution_options(populate_existing=True)
+        )
+        user = query.scalar_one()
+        await session.commit()
+
+        # On conflict the existing row keeps its own vpn_id, so ours only survives an insert.
+        if user.vpn_id == vpn_id:
+            logger.info(f"New user {tg_id} created.")  # TODO: Notify
+        else:
+            logger.debug(f"User {tg_id} was created concurrently, updated existing record.")
+
+        return user
+
     @classmethod
     async def update(cls, session: AsyncSession, tg_id: int, **kwargs: Any) -> Self | None:
         user = await User.get(session=session, tg_id=tg_id)